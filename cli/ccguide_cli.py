@@ -7,12 +7,56 @@ Easy enable/disable functionality for CCGuide without modifying Claude Code sett
 
 import os
 import sys
+import stat
 import json
-import argparse
+import time
+import importlib.util
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Optional
 
 
+def _build_hooks_template() -> str:
+    """Serialize the hooks config once, leaving {cmd} and {pp} as format fields."""
+    hooks_config = {
+        "hooks": {
+            "Stop": [
+                {
+                    "hooks": [
+                        {
+                            "type": "command",
+                            "command": "@@CMD@@",
+                            "env": {
+                                "PYTHONPATH": "@@PP@@"
+                            }
+                        }
+                    ]
+                }
+            ]
+        }
+    }
+    
+    template = json.dumps(hooks_config, indent=2)
+    template = template.replace('{', '{{').replace('}', '}}')
+    return template.replace('@@CMD@@', '{cmd}').replace('@@PP@@', '{pp}')
+
+
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """Stat a path with a single syscall, returning None if it does not exist."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _json_string_body(value: str) -> str:
+    """Escape a value for insertion between the quotes of a JSON string."""
+    return json.dumps(value)[1:-1]
+
+
+_HOOKS_TEMPLATE = _build_hooks_template()
+
+
 class CCGuideCLI:
     """CLI interface for CCGuide management."""
     
@@ -21,9 +65,19 @@ class CCGuideCLI:
         self.config_file = self.config_dir / 'config.json'
         self.status_file = self.config_dir / 'status.json'
         self.ccguide_dir = Path(__file__).parent.parent.absolute()
+        self._config_cache = None
+        self._config_mtime = None
+        self.tty = sys.stdout.isatty()
         
+    def _icon(self, emoji: str) -> str:
+        """Return an emoji prefix for terminal output, or nothing when piped."""
+        return f"{emoji} " if self.tty else ""
+    
     def print_banner(self):
         """Print CCGuide CLI banner."""
+        if not self.tty:
+            return
+        
         banner = """
     ╔═══════════════════════════════════════╗
     ║           🧭 CCGuide CLI              ║
@@ -33,26 +87,53 @@ class CCGuideCLI:
         print(banner)
     
     def load_config(self) -> dict:
-        """Load CCGuide configuration."""
-        if not self.config_file.exists():
+        """Load CCGuide configuration, reusing the parsed copy while the file is unchanged."""
+        st = _stat_or_none(self.config_file)
+        if st is None:
             print(f"❌ Config file not found: {self.config_file}")
             print("   Run 'python3 setup.py' first to initialize CCGuide")
             sys.exit(1)
         
         try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+            mtime = st.st_mtime
+            if self._config_cache is not None and mtime == self._config_mtime:
+                return self._config_cache
+            
+            self._config_cache = json.loads(self.config_file.read_bytes())
+            self._config_mtime = mtime
+            return self._config_cache
         except Exception as e:
             print(f"❌ Failed to load config: {e}")
             sys.exit(1)
     
     def save_config(self, config: dict):
         """Save CCGuide configuration."""
+        # Replace the file a symlinked config.json points to, not the link itself
+        target = self.config_file.resolve()
+        tmp_file = target.with_name(target.name + '.tmp')
         try:
             self.config_dir.mkdir(exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            # Write to a temp file and swap it in so a crash never leaves a half-written config
+            payload = json.dumps(config, indent=2).encode('utf-8')
+            
+            # The config holds the API key: keep the current file's permissions, and
+            # make a new one readable by the owner only
+            st = _stat_or_none(target)
+            mode = stat.S_IMODE(st.st_mode) if st is not None else 0o600
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            # Not narrowed by the umask, nor kept from a stale temp file (os.fchmod is POSIX-only)
+            os.chmod(tmp_file, mode)
+            
+            os.replace(tmp_file, target)
+            self._config_cache = config
+            self._config_mtime = os.stat(self.config_file).st_mtime
         except Exception as e:
+            try:
+                tmp_file.unlink()
+            except OSError:
+                pass
             print(f"❌ Failed to save config: {e}")
             sys.exit(1)
     
@@ -64,7 +145,8 @@ class CCGuideCLI:
             'enabled': config.get('enable_suggestions', False),
             'api_key_set': bool(config.get('gemini_api_key', '').strip()),
             'config_file': str(self.config_file),
-            'last_modified': self.config_file.stat().st_mtime if self.config_file.exists() else None
+            # load_config() has just stat'ed the file
+            'last_modified': self._config_mtime
         }
         
         return status
@@ -107,6 +189,7 @@ class CCGuideCLI:
         config = self.load_config()
         current_state = config.get('enable_suggestions', True)
         
+        # enable()/disable() reuse the cached config instead of re-parsing it
         if current_state:
             self.disable()
         else:
@@ -117,37 +200,40 @@ class CCGuideCLI:
         try:
             status = self.get_status()
             
-            print("📊 CCGuide Status")
-            print("=" * 40)
+            lines = [f"{self._icon('📊')}CCGuide Status"]
+            if self.tty:
+                lines.append("=" * 40)
             
             # Main status
             if status['enabled']:
-                print("🟢 Status: ENABLED")
-                print("   CCGuide will provide suggestions after Claude Code sessions")
+                lines.append(f"{self._icon('🟢')}Status: ENABLED")
+                lines.append("   CCGuide will provide suggestions after Claude Code sessions")
             else:
-                print("🔴 Status: DISABLED")
-                print("   CCGuide will not provide suggestions")
+                lines.append(f"{self._icon('🔴')}Status: DISABLED")
+                lines.append("   CCGuide will not provide suggestions")
             
-            print()
+            lines.append("")
             
             # API Key status
             if status['api_key_set']:
-                print("🔑 API Key: SET")
+                lines.append(f"{self._icon('🔑')}API Key: SET")
             else:
-                print("❌ API Key: NOT SET")
-                print("   Configure with: ccguide config --api-key YOUR_KEY")
+                lines.append(f"{self._icon('❌')}API Key: NOT SET")
+                lines.append("   Configure with: ccguide config --api-key YOUR_KEY")
             
-            print()
+            lines.append("")
             
             if verbose:
-                print("📁 Configuration:")
-                print(f"   Config file: {status['config_file']}")
-                print(f"   CCGuide directory: {self.ccguide_dir}")
+                lines.append(f"{self._icon('📁')}Configuration:")
+                lines.append(f"   Config file: {status['config_file']}")
+                lines.append(f"   CCGuide directory: {self.ccguide_dir}")
                 
                 if status['last_modified']:
-                    import datetime
-                    mod_time = datetime.datetime.fromtimestamp(status['last_modified'])
-                    print(f"   Last modified: {mod_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                    mod_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(status['last_modified']))
+                    lines.append(f"   Last modified: {mod_time}")
+            
+            # One write instead of a print per line
+            sys.stdout.write("\n".join(lines) + "\n")
         
         except Exception as e:
             print(f"❌ Failed to get status: {e}")
@@ -188,29 +274,51 @@ class CCGuideCLI:
         else:
             print("⚠️  No changes made")
     
+    def _tail_lines(self, path: Path, lines: int, chunk_size: int = 8192) -> list:
+        """Return the last ``lines`` raw lines of a file without reading all of it."""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            
+            # Small logs are cheaper to read in one go
+            if size < 64 * 1024 or lines <= 0:
+                f.seek(0)
+                return f.read().splitlines()[-lines:]
+            
+            data = bytearray()
+            pos = size
+            while pos > 0 and data.count(b'\n') <= lines:
+                step = min(chunk_size, pos)
+                pos -= step
+                f.seek(pos)
+                data[:0] = f.read(step)
+        
+        tail = data.splitlines()
+        # Drop the partial first line unless we reached the start of the file
+        if pos > 0:
+            tail = tail[1:]
+        return tail[-lines:]
+    
     def logs(self, lines: int = 20):
         """Show recent CCGuide logs."""
         log_file = self.config_dir / 'assistant.log'
         
-        if not log_file.exists():
-            print("📋 No logs found")
-            print(f"   Log file: {log_file}")
-            return
-        
         try:
-            with open(log_file, 'r') as f:
-                log_lines = f.readlines()
+            log_lines = self._tail_lines(log_file, lines)
             
-            print(f"📋 Last {min(lines, len(log_lines))} log entries:")
+            print(f"📋 Last {len(log_lines)} log entries:")
             print("=" * 60)
             
-            for line in log_lines[-lines:]:
-                print(line.rstrip())
+            for line in log_lines:
+                print(line.decode('utf-8', errors='replace').rstrip())
         
+        except FileNotFoundError:
+            print("📋 No logs found")
+            print(f"   Log file: {log_file}")
         except Exception as e:
             print(f"❌ Failed to read logs: {e}")
     
-    def test(self):
+    def test(self, deep: bool = False):
         """Test CCGuide functionality."""
         print("🧪 Testing CCGuide...")
         
@@ -236,15 +344,31 @@ class CCGuideCLI:
         else:
             print("✅ Gemini API key configured")
         
-        # Test imports
-        try:
-            sys.path.insert(0, str(self.ccguide_dir / 'src'))
-            from stop_hook_handler import CCGuide
-            print("✅ CCGuide modules importable")
-        except Exception as e:
-            print(f"❌ Module import failed: {e}")
+        # Locate the hook handler; only execute it (pulling in the Gemini SDK) on --deep
+        handler_path = self.ccguide_dir / 'src' / 'stop_hook_handler.py'
+        spec = None
+        if _stat_or_none(handler_path) is not None:
+            spec = importlib.util.spec_from_file_location('stop_hook_handler', handler_path)
+        
+        if spec is None:
+            print(f"❌ Module not found: {handler_path}")
             return
         
+        if deep:
+            try:
+                sys.path.insert(0, str(handler_path.parent))
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                # The handler defers these until a hook needs them
+                for name in ('gemini_decision_engine', 'gemini_suggestion_engine', 'google.generativeai'):
+                    importlib.import_module(name)
+                print("✅ CCGuide modules importable")
+            except Exception as e:
+                print(f"❌ Module import failed: {e}")
+                return
+        else:
+            print("✅ CCGuide modules found (run 'ccguide test --deep' to import them)")
+        
         print("🎉 CCGuide appears to be working correctly!")
     
     def hooks_config(self):
@@ -252,27 +376,14 @@ class CCGuideCLI:
         print("🪝 Claude Code Hooks Configuration")
         print("=" * 50)
         
-        hooks_config = {
-            "hooks": {
-                "Stop": [
-                    {
-                        "hooks": [
-                            {
-                                "type": "command",
-                                "command": f"python3 {self.ccguide_dir / 'src' / 'stop_hook_handler.py'}",
-                                "env": {
-                                    "PYTHONPATH": str(self.ccguide_dir)
-                                }
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
+        hook_command = f"python3 {self.ccguide_dir / 'src' / 'stop_hook_handler.py'}"
         
         print("Copy this JSON to your Claude Code settings:")
         print()
-        print(json.dumps(hooks_config, indent=2))
+        print(_HOOKS_TEMPLATE.format(
+            cmd=_json_string_body(hook_command),
+            pp=_json_string_body(str(self.ccguide_dir))
+        ))
         print()
         print("📋 Instructions:")
         print("1. Copy the JSON above")
@@ -281,8 +392,81 @@ class CCGuideCLI:
         print("4. Save and restart Claude Code")
 
 
-def main():
-    """Main CLI entry point."""
+# Options accepted by the fast path: flag -> (dest, type); bool marks a store_true flag
+_FAST_OPTIONS = {
+    'status': {'-v': ('verbose', bool), '--verbose': ('verbose', bool)},
+    'enable': {},
+    'disable': {},
+    'toggle': {},
+    'config': {'--api-key': ('api_key', str), '--cooldown': ('cooldown', int),
+               '--min-length': ('min_length', int)},
+    'logs': {'-n': ('lines', int), '--lines': ('lines', int)},
+    'test': {'--deep': ('deep', bool)},
+    'hooks': {},
+}
+
+_FAST_DEFAULTS = {
+    'status': {'verbose': False},
+    'config': {'api_key': None, 'cooldown': None, 'min_length': None},
+    'logs': {'lines': 20},
+    'test': {'deep': False},
+}
+
+
+def _is_negative_number(token: str) -> bool:
+    """argparse's test for a negative number (-5, -.5, -1.5) rather than an option."""
+    whole, dot, fraction = token[1:].partition('.')
+    if dot:
+        return (not whole or whole.isdecimal()) and fraction.isdecimal()
+    return whole.isdecimal()
+
+
+def _fast_parse_args(argv: list) -> Optional[SimpleNamespace]:
+    """Parse common command lines without building the argparse parser.
+    
+    Returns None when argparse should handle argv (help, typos, bad values).
+    """
+    if not argv or argv[0] not in _FAST_OPTIONS:
+        return None
+    
+    command = argv[0]
+    options = _FAST_OPTIONS[command]
+    args = {'command': command, **_FAST_DEFAULTS.get(command, {})}
+    
+    rest = argv[1:]
+    i = 0
+    while i < len(rest):
+        flag, has_value, value = rest[i].partition('=')
+        i += 1
+        if flag not in options:
+            return None
+        
+        dest, kind = options[flag]
+        if kind is bool:
+            if has_value:
+                return None
+            args[dest] = True
+            continue
+        
+        if not has_value:
+            # argparse only takes a dash-prefixed value when it looks like a negative number
+            if i >= len(rest) or (rest[i].startswith('-') and not _is_negative_number(rest[i])):
+                return None
+            value = rest[i]
+            i += 1
+        
+        try:
+            args[dest] = kind(value)
+        except ValueError:
+            return None
+    
+    return SimpleNamespace(**args)
+
+
+def _build_parser():
+    """Build the full argparse parser, used for help and anything the fast path rejects."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='CCGuide CLI - Manage Claude Code AI Guide',
         prog='ccguide'
@@ -316,16 +500,27 @@ def main():
                            help='Number of log lines to show (default: 20)')
     
     # Test command
-    subparsers.add_parser('test', help='Test CCGuide functionality')
+    test_parser = subparsers.add_parser('test', help='Test CCGuide functionality')
+    test_parser.add_argument('--deep', action='store_true',
+                            help='Also import the hook handler and its dependencies')
     
     # Hooks command
     subparsers.add_parser('hooks', help='Generate Claude Code hooks configuration')
     
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """Main CLI entry point."""
+    args = _fast_parse_args(sys.argv[1:])
     
-    if not args.command:
-        parser.print_help()
-        return
+    if args is None:
+        parser = _build_parser()
+        args = parser.parse_args()
+        
+        if not args.command:
+            parser.print_help()
+            return
     
     cli = CCGuideCLI()
     
@@ -349,7 +544,7 @@ def main():
         cli.logs(lines=args.lines)
     elif args.command == 'test':
         cli.print_banner()
-        cli.test()
+        cli.test(deep=args.deep)
     elif args.command == 'hooks':
         cli.hooks_config()
 
@@ -5,14 +5,31 @@ This package contains the core functionality for CCGuide:
 - stop_hook_handler: Main entry point for Claude Code hooks
 - gemini_decision_engine: Intelligent decision making with Flash-Lite
 - gemini_suggestion_engine: Contextual suggestions with Flash
+- gemini_models: Gemini clients shared by the engines
 """
 
 __version__ = "1.0.0"
 __author__ = "ProCreations Official"
 
-from .stop_hook_handler import CCGuide
-from .gemini_decision_engine import GeminiDecisionEngine  
-from .gemini_suggestion_engine import GeminiSuggestionEngine
+import importlib
+
+# Submodules pull in the Gemini SDK, so they are only imported on first access
+_LAZY_EXPORTS = {
+    "CCGuide": "stop_hook_handler",
+    "GeminiDecisionEngine": "gemini_decision_engine",
+    "GeminiSuggestionEngine": "gemini_suggestion_engine",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "CCGuide",
@@ -2,39 +2,129 @@
 Gemini Decision Engine - Uses Flash-Lite for efficient decision making
 """
 
+import re
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
-import google.generativeai as genai
+
+try:
+    from .gemini_models import get_model
+except ImportError:  # loaded as a top-level module by the hook handler
+    from gemini_models import get_model
+
+
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """Compile a single alternation that matches any of the keywords as a substring."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
+# Keyword groups are matched against the lowercased session in one regex scan each.
+# The cheap groups feed the fallback heuristic; the detail groups only go into the prompt.
+_CHEAP_KEYWORDS = {
+    'has_code': _keyword_pattern(['def ', 'function', 'class ', 'import ', 'const ', 'var ', 'let ']),
+    'has_errors': _keyword_pattern(['error', 'exception', 'failed', 'traceback', 'syntax error']),
+}
+_DETAIL_KEYWORDS = {
+    'has_testing': _keyword_pattern(['test', 'pytest', 'unittest', 'jest', 'spec']),
+    'has_git': _keyword_pattern(['git ', 'commit', 'branch', 'merge', 'pull request']),
+}
+
+_COMPLEX = frozenset(('todo', 'fixme', 'hack', 'temp'))
+
+# Counts whitespace-delimited complexity markers (the same tokens str.split() would
+# yield) in one C-level scan, without allocating a list of every word
+_COMPLEX_RE = re.compile(r'(?<!\S)(?:%s)(?!\S)' % '|'.join(sorted(_COMPLEX)))
+
+# The model's answer is its leading YES/NO token as a whole word ("Yes." but not "Yesterday")
+_DECISION_RE = re.compile(r'\s*(yes|no)\b', re.IGNORECASE)
+
+# Only the head and tail of long sessions are sent to the decision model
+_CONTEXT_HEAD_CHARS = 4000
+_CONTEXT_TAIL_CHARS = 8000
 
 
 class GeminiDecisionEngine:
     """Handles decision logic using Gemini 2.5 Flash-Lite for efficiency."""
     
+    _DECISION_PROMPT = """
+You are a smart filter for Claude Code AI suggestions. Analyze the session and decide if suggestions would be valuable.
+
+SESSION METRICS:
+- Length: {length} characters
+- Has code: {has_code}
+- Has errors: {has_errors}
+- Has testing: {has_testing}
+- Has git activity: {has_git}
+- Complexity indicators: {complexity_indicators}
+
+FULL SESSION CONTEXT:
+{full_context}
+
+DECISION CRITERIA:
+✅ Suggest if:
+- Significant coding work was done
+- Code quality issues are apparent
+- Security concerns exist
+- Testing gaps are visible
+- Documentation is missing
+- Architecture could be improved
+- Best practices weren't followed
+
+❌ Don't suggest if:
+- Task is trivial (simple edits, file reads)
+- User is just exploring/learning
+- Session is primarily conversational
+- Work is already high-quality
+- Previous suggestions were ignored
+
+Respond with only "YES" or "NO".
+"""
+    
     def __init__(self, api_key: str, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.session_history = {}
         self.cooldown_file = Path.home() / '.ccguide' / 'last_suggestion.txt'
+        # (cooldown file mtime, time it was read) - reused for a second to avoid repeated stats
+        self._cd_cache = (0.0, 0.0)
+        # Whether the last decision came from a Gemini response (not a local check or fallback)
+        self.answered_by_model = False
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        self._api_key = api_key
+        self._model = None
+    
+    @property
+    def model(self):
+        """Flash-Lite client, created on first use so local checks never load the SDK."""
+        if self._model is None:
+            self._model = get_model(self._api_key, 'gemini-2.5-flash-lite')
+        return self._model
         
     def is_in_cooldown(self, session_id: str) -> bool:
         """Check if we're still in cooldown period for suggestions."""
-        cooldown_minutes = self.config.get('suggestion_cooldown', 300) / 60
+        cooldown = self.config.get('suggestion_cooldown', 300)
+        now = time.time()
         
-        try:
-            if self.cooldown_file.exists():
-                last_suggestion_time = float(self.cooldown_file.read_text().strip())
-                time_since_last = time.time() - last_suggestion_time
-                if time_since_last < self.config.get('suggestion_cooldown', 300):
-                    remaining = (self.config.get('suggestion_cooldown', 300) - time_since_last) / 60
-                    self.logger.info(f"In cooldown: {remaining:.1f} minutes remaining")
-                    return True
-        except Exception as e:
-            self.logger.warning(f"Failed to check cooldown: {e}")
+        cached_mtime, cached_at = self._cd_cache
+        if now - cached_at < 1.0:
+            last_suggestion_time = cached_mtime
+        else:
+            try:
+                # The cooldown file's mtime is the last suggestion time
+                last_suggestion_time = self.cooldown_file.stat().st_mtime
+            except FileNotFoundError:
+                last_suggestion_time = 0.0
+            except Exception as e:
+                self.logger.warning(f"Failed to check cooldown: {e}")
+                return False
+            self._cd_cache = (last_suggestion_time, now)
+        
+        time_since_last = now - last_suggestion_time
+        if time_since_last < cooldown:
+            remaining = (cooldown - time_since_last) / 60
+            self.logger.info(f"In cooldown: {remaining:.1f} minutes remaining")
+            return True
         
         return False
     
@@ -42,101 +132,143 @@ class GeminiDecisionEngine:
         """Update the last suggestion timestamp."""
         try:
             self.cooldown_file.parent.mkdir(exist_ok=True)
-            self.cooldown_file.write_text(str(time.time()))
+            self.cooldown_file.touch()
+            now = time.time()
+            self._cd_cache = (now, now)
         except Exception as e:
             self.logger.error(f"Failed to update cooldown: {e}")
     
-    def analyze_session_context(self, session_context: str) -> Dict[str, Any]:
+    def analyze_session_context(self, session_context: str, length: Optional[int] = None) -> Dict[str, Any]:
         """Analyze session context for decision-making factors."""
-        analysis = {
-            'length': len(session_context),
-            'has_code': any(keyword in session_context.lower() for keyword in 
-                          ['def ', 'function', 'class ', 'import ', 'const ', 'var ', 'let ']),
-            'has_errors': any(keyword in session_context.lower() for keyword in 
-                           ['error', 'exception', 'failed', 'traceback', 'syntax error']),
-            'has_testing': any(keyword in session_context.lower() for keyword in 
-                            ['test', 'pytest', 'unittest', 'jest', 'spec']),
-            'has_git': any(keyword in session_context.lower() for keyword in 
-                         ['git ', 'commit', 'branch', 'merge', 'pull request']),
-            'complexity_indicators': len([word for word in session_context.split() 
-                                        if word.lower() in ['todo', 'fixme', 'hack', 'temp']]),
-        }
+        if length is None:
+            length = len(session_context)
+        lower = session_context.lower()
+        analysis = self._cheap_analysis(lower, length)
+        return self._full_analysis(lower, analysis)
+    
+    def _cheap_analysis(self, lower: str, length: int) -> Dict[str, Any]:
+        """Compute the factors the fallback heuristic needs."""
+        analysis = {'length': length}
+        for name, pattern in _CHEAP_KEYWORDS.items():
+            analysis[name] = pattern.search(lower) is not None
+        analysis['complexity_indicators'] = len(_COMPLEX_RE.findall(lower))
+        
+        return analysis
+    
+    def _full_analysis(self, lower: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the factors that are only reported to the Gemini prompt."""
+        for name, pattern in _DETAIL_KEYWORDS.items():
+            analysis[name] = pattern.search(lower) is not None
         
         return analysis
     
-    def should_suggest(self, session_id: str, session_context: str) -> bool:
-        """Main decision logic using Gemini Flash-Lite."""
+    def _truncate_context(self, session_context: str, length: int) -> str:
+        """Keep the beginning and most recent part of a long session for the prompt."""
+        # Already windowed by the caller, which marked its own cut
+        if len(session_context) < length:
+            return session_context
         
+        max_chars = _CONTEXT_HEAD_CHARS + _CONTEXT_TAIL_CHARS
+        if length <= max_chars:
+            return session_context
+        
+        truncated = length - max_chars
+        return (session_context[:_CONTEXT_HEAD_CHARS]
+                + f"\n...[truncated {truncated} chars]...\n"
+                + session_context[-_CONTEXT_TAIL_CHARS:])
+    
+    def should_suggest(self, session_id: str, session_context: str,
+                       length: Optional[int] = None) -> bool:
+        """Main decision logic using Gemini Flash-Lite.
+        
+        Pass ``length`` when ``session_context`` is only a window of a longer session.
+        """
+        self.answered_by_model = False
+        prepared = self._prepare_decision(session_id, session_context, length)
+        if prepared is None:
+            return False
+        decision_prompt, analysis = prepared
+        
+        try:
+            response = self.model.generate_content(decision_prompt)
+            return self._record_decision(session_id, response.text)
+            
+        except Exception as e:
+            self.logger.error(f"Gemini decision engine failed: {e}")
+            # Fallback to simple heuristics
+            return self._fallback_decision(analysis)
+    
+    async def should_suggest_async(self, session_id: str, session_context: str,
+                                   length: Optional[int] = None) -> bool:
+        """Async variant of should_suggest; the local checks run before the first await."""
+        self.answered_by_model = False
+        prepared = self._prepare_decision(session_id, session_context, length)
+        if prepared is None:
+            return False
+        decision_prompt, analysis = prepared
+        
+        try:
+            response = await self.model.generate_content_async(decision_prompt)
+            return self._record_decision(session_id, response.text)
+            
+        except Exception as e:
+            self.logger.error(f"Gemini decision engine failed: {e}")
+            # Fallback to simple heuristics
+            return self._fallback_decision(analysis)
+    
+    def _prepare_decision(self, session_id: str, session_context: str,
+                          length: Optional[int] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Run the local checks and build the Gemini prompt.
+        
+        Returns (prompt, analysis), or None when no suggestion should be made.
+        """
         # Basic checks first
         if not self.config.get('enable_suggestions', True):
             self.logger.info("Suggestions disabled in config")
-            return False
+            return None
         
-        if len(session_context) < self.config.get('min_session_length', 100):
+        if length is None:
+            length = len(session_context)
+        if length < self.config.get('min_session_length', 100):
             self.logger.info("Session too short for suggestions")
-            return False
+            return None
         
         if self.is_in_cooldown(session_id):
-            return False
+            return None
         
         # Analyze session context
-        analysis = self.analyze_session_context(session_context)
+        lower = session_context.lower()
+        analysis = self._cheap_analysis(lower, length)
+        
+        # Without code, errors or complexity markers the session can't reach the
+        # fallback threshold either, so skip the network round-trip
+        if not (analysis['has_code'] or analysis['has_errors'] or analysis['complexity_indicators']):
+            self.logger.info("No coding activity detected, skipping Gemini decision")
+            return None
+        
+        # Detail factors are only needed for the prompt
+        analysis = self._full_analysis(lower, analysis)
         self.logger.info(f"Session analysis: {analysis}")
         
-        # Use full context for AI decision
-        full_context = session_context
+        full_context = self._truncate_context(session_context, length)
         
-        decision_prompt = f"""
-You are a smart filter for Claude Code AI suggestions. Analyze the session and decide if suggestions would be valuable.
-
-SESSION METRICS:
-- Length: {analysis['length']} characters
-- Has code: {analysis['has_code']}
-- Has errors: {analysis['has_errors']}
-- Has testing: {analysis['has_testing']}
-- Has git activity: {analysis['has_git']}
-- Complexity indicators: {analysis['complexity_indicators']}
-
-FULL SESSION CONTEXT:
-{full_context}
-
-DECISION CRITERIA:
-✅ Suggest if:
-- Significant coding work was done
-- Code quality issues are apparent
-- Security concerns exist
-- Testing gaps are visible
-- Documentation is missing
-- Architecture could be improved
-- Best practices weren't followed
-
-❌ Don't suggest if:
-- Task is trivial (simple edits, file reads)
-- User is just exploring/learning
-- Session is primarily conversational
-- Work is already high-quality
-- Previous suggestions were ignored
-
-Respond with only "YES" or "NO".
-"""
+        return self._DECISION_PROMPT.format(full_context=full_context, **analysis), analysis
+    
+    def _record_decision(self, session_id: str, response_text: str) -> bool:
+        """Interpret the model's YES/NO answer and start the cooldown on YES."""
+        # Only the leading token matters; don't uppercase any trailing commentary
+        match = _DECISION_RE.match(response_text)
+        decision = match.group(1).upper() if match else response_text.strip()[:20]
         
-        try:
-            response = self.model.generate_content(decision_prompt)
-            decision = response.text.strip().upper()
-            
-            should_suggest = decision == "YES"
-            
-            self.logger.info(f"Gemini decision for session {session_id}: {decision} -> {should_suggest}")
-            
-            if should_suggest:
-                self.update_cooldown()
-            
-            return should_suggest
-            
-        except Exception as e:
-            self.logger.error(f"Gemini decision engine failed: {e}")
-            # Fallback to simple heuristics
-            return self._fallback_decision(analysis)
+        should_suggest = decision == "YES"
+        self.answered_by_model = True
+        
+        self.logger.info(f"Gemini decision for session {session_id}: {decision} -> {should_suggest}")
+        
+        if should_suggest:
+            self.update_cooldown()
+        
+        return should_suggest
     
     def _fallback_decision(self, analysis: Dict[str, Any]) -> bool:
         """Fallback decision logic when Gemini is unavailable."""
@@ -0,0 +1,30 @@
+"""
+Gemini Models - Process-wide Gemini clients shared by the CCGuide engines
+"""
+
+from typing import Any, Dict, Optional
+
+
+# genai.configure() is process-global and a model binds the configured client on
+# first use, so only one API key can be active; switching keys drops the models
+_configured_key: Optional[str] = None
+_models: Dict[str, Any] = {}
+
+
+def get_model(api_key: str, model_name: str):
+    """Return the shared GenerativeModel for ``model_name``, configuring ``api_key`` first."""
+    global _configured_key
+    
+    # Imported here so loading the engines stays cheap when no model is needed
+    import google.generativeai as genai
+    
+    if api_key != _configured_key:
+        genai.configure(api_key=api_key)
+        _models.clear()
+        _configured_key = api_key
+    
+    model = _models.get(model_name)
+    if model is None:
+        model = genai.GenerativeModel(model_name)
+        _models[model_name] = model
+    return model
@@ -2,11 +2,244 @@
 Gemini Suggestion Engine - Uses Flash for detailed analysis and suggestions
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 from pathlib import Path
 import re
-import google.generativeai as genai
+
+try:
+    from .gemini_models import get_model
+except ImportError:  # loaded as a top-level module by the hook handler
+    from gemini_models import get_model
+
+try:
+    import ahocorasick
+except ImportError:  # optional accelerator, see _indicator_automaton()
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:  # optional accelerator, see _indicator_database()
+    hyperscan = None
+
+
+# Indicator strings are matched as substrings of the lowercased session
+_LANGUAGE_INDICATORS: Mapping[str, Tuple[str, ...]] = {
+    'python': ('.py', 'def ', 'import ', 'python', 'pip', 'pytest'),
+    'javascript': ('.js', '.ts', '.jsx', '.tsx', 'function', 'const ', 'npm', 'node'),
+    'java': ('.java', 'public class', 'import java', 'maven', 'gradle'),
+    'c++': ('.cpp', '.h', '#include', 'std::', 'cmake'),
+    'rust': ('.rs', 'fn ', 'use ', 'cargo', 'impl '),
+    'go': ('.go', 'func ', 'package ', 'import '),
+    'html': ('.html', '<html>', '<div>', '<script>'),
+    'css': ('.css', 'style', 'display:', 'margin:'),
+    'sql': ('.sql', 'SELECT', 'FROM', 'WHERE', 'INSERT'),
+    'shell': ('.sh', '#!/bin/bash', 'chmod', 'mkdir')
+}
+
+_FRAMEWORK_INDICATORS: Mapping[str, Tuple[str, ...]] = {
+    'react': ('react', 'jsx', 'usestate', 'useeffect', 'component'),
+    'vue': ('vue', '@click', 'v-model', 'mounted()'),
+    'angular': ('angular', '@component', '@injectable', 'ngmodel'),
+    'flask': ('flask', 'app.route', '@app.route', 'render_template'),
+    'django': ('django', 'models.py', 'views.py', 'urls.py'),
+    'express': ('express', 'app.get', 'app.post', 'middleware'),
+    'spring': ('spring', '@controller', '@service', '@autowired'),
+    'tensorflow': ('tensorflow', 'keras', 'model.fit', 'neural'),
+    'pytorch': ('pytorch', 'torch', 'nn.module', 'tensor'),
+    'pandas': ('pandas', 'dataframe', 'pd.read', 'groupby'),
+    'numpy': ('numpy', 'np.array', 'ndarray', 'matrix'),
+}
+
+_TOOL_INDICATORS: Mapping[str, Tuple[str, ...]] = {
+    'git': ('git add', 'git commit', 'git push', 'git pull'),
+    'docker': ('docker', 'dockerfile', 'docker-compose'),
+    'kubernetes': ('kubectl', 'k8s', 'deployment.yaml'),
+    'aws': ('aws', 'ec2', 's3', 'lambda', 'cloudformation'),
+    'ci/cd': ('github actions', 'jenkins', 'ci.yml', '.github/workflows'),
+    'testing': ('test', 'pytest', 'jest', 'unittest', 'mocha'),
+    'linting': ('eslint', 'pylint', 'flake8', 'prettier'),
+}
+
+_PATTERN_INDICATORS: Mapping[str, Tuple[str, ...]] = {
+    'api_development': ('api', 'endpoint', 'rest', 'json', 'request', 'response'),
+    'database_work': ('database', 'sql', 'query', 'table', 'migration'),
+    'frontend_work': ('frontend', 'ui', 'component', 'styling', 'responsive'),
+    'backend_work': ('backend', 'server', 'authentication', 'middleware'),
+    'data_analysis': ('data', 'analysis', 'visualization', 'statistics'),
+    'machine_learning': ('ml', 'model', 'training', 'prediction', 'algorithm'),
+    'devops': ('deployment', 'infrastructure', 'monitoring', 'scaling'),
+    'security': ('authentication', 'authorization', 'encryption', 'security'),
+}
+
+_ISSUE_PATTERNS: Mapping[str, Tuple[str, ...]] = {
+    'hardcoded_credentials': ('password =', 'api_key =', 'secret =', 'token ='),
+    'missing_error_handling': ('except:', 'catch', 'try:'),
+    'code_duplication': ('todo', 'fixme', 'hack', 'temporary'),
+    'performance_concerns': ('loop', 'nested', 'n+1', 'timeout'),
+    'security_concerns': ('eval(', 'exec(', 'shell=true', 'sql injection'),
+    'testing_gaps': ('# no tests', 'untested', 'manual testing'),
+}
+
+# Checked in order; the first category with any keyword present wins
+_SESSION_TYPE_KEYWORDS: Mapping[str, Tuple[str, ...]] = {
+    'project_setup': ('new project', 'initial', 'setup', 'scaffold'),
+    'bug_fixing': ('bug', 'fix', 'error', 'debug'),
+    'feature_development': ('feature', 'implement', 'add', 'create'),
+    'refactoring': ('refactor', 'cleanup', 'optimize', 'improve'),
+    'testing': ('test', 'testing', 'spec', 'coverage'),
+    'deployment': ('deploy', 'release', 'production', 'ci/cd'),
+}
+
+# keyword -> session type for classifying from the single-pass scan matches
+# (built in reverse so the first category listing a keyword wins)
+_SESSION_TYPE_KW: Dict[str, str] = {
+    keyword: session_type
+    for session_type, keywords in reversed(tuple(_SESSION_TYPE_KEYWORDS.items()))
+    for keyword in keywords
+}
+_SESSION_TYPES = tuple(_SESSION_TYPE_KEYWORDS)
+_SESSION_TYPE_RANK = {session_type: rank for rank, session_type in enumerate(_SESSION_TYPES)}
+
+_INDICATOR_CATEGORIES = {
+    'languages': _LANGUAGE_INDICATORS,
+    'frameworks': _FRAMEWORK_INDICATORS,
+    'tools': _TOOL_INDICATORS,
+    'patterns': _PATTERN_INDICATORS,
+    'issues': _ISSUE_PATTERNS,
+}
+
+
+def _encode_indicators(indicator_map: Mapping[str, Tuple[str, ...]]) -> Dict[str, Tuple[bytes, ...]]:
+    """Encode a category table for substring search over the session bytes."""
+    return {name: tuple(indicator.encode() for indicator in indicators)
+            for name, indicators in indicator_map.items()}
+
+
+# Byte-string tables for the detectors used when no single-pass scanner is available
+_LANGUAGE_BYTES = _encode_indicators(_LANGUAGE_INDICATORS)
+_FRAMEWORK_BYTES = _encode_indicators(_FRAMEWORK_INDICATORS)
+_TOOL_BYTES = _encode_indicators(_TOOL_INDICATORS)
+_PATTERN_BYTES = _encode_indicators(_PATTERN_INDICATORS)
+_ISSUE_BYTES = _encode_indicators(_ISSUE_PATTERNS)
+_SESSION_TYPE_BYTES = _encode_indicators(_SESSION_TYPE_KEYWORDS)
+
+# Indicators are all ASCII, so scanning ASCII-lowercased UTF-8 bytes is equivalent
+# to scanning str.lower() and keeps the search loops in C over one byte per char
+_ASCII_LOWER = bytes.maketrans(bytes(range(0x41, 0x5B)), bytes(range(0x61, 0x7B)))
+
+_automaton = None
+_database = None
+
+# Recent analyses keyed by a digest of the session, so the cache never pins transcripts
+_ANALYSIS_CACHE: "OrderedDict[bytes, Mapping[str, Any]]" = OrderedDict()
+_ANALYSIS_CACHE_SIZE = 128
+
+
+def _all_indicators() -> Tuple[str, ...]:
+    """Every distinct indicator string and session type keyword."""
+    words = set(_SESSION_TYPE_KW)
+    for indicator_map in _INDICATOR_CATEGORIES.values():
+        for indicators in indicator_map.values():
+            words.update(indicators)
+    return tuple(sorted(words))
+
+
+def _indicator_automaton():
+    """Build (once per process) an Aho-Corasick automaton over every indicator string.
+    
+    Returns None when pyahocorasick is not installed.
+    """
+    global _automaton
+    if _automaton is None and ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for indicator in _all_indicators():
+            automaton.add_word(indicator, indicator)
+        automaton.make_automaton()
+        _automaton = automaton
+    return _automaton
+
+
+def _indicator_database():
+    """Compile (once per process) a Hyperscan literal database over every indicator string.
+    
+    Returns ``(database, indicators)`` where match ids index into ``indicators``,
+    or None when hyperscan is not installed or the database fails to compile.
+    """
+    global _database
+    if _database is None and hyperscan is not None:
+        indicators = _all_indicators()
+        try:
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            # Each indicator only needs to be reported once per scan
+            database.compile(expressions=[indicator.encode() for indicator in indicators],
+                             ids=list(range(len(indicators))),
+                             flags=hyperscan.HS_FLAG_SINGLEMATCH,
+                             literal=True)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Hyperscan unavailable, falling back: {e}")
+            _database = False
+        else:
+            _database = (database, indicators)
+    return _database or None
+
+
+def _find_indicators(context_lower: bytes) -> Optional[set]:
+    """Return every indicator in the lowercased session using a single-pass scanner.
+    
+    Returns None when neither hyperscan nor pyahocorasick is available.
+    """
+    database = _indicator_database()
+    if database is not None:
+        database, indicators = database
+        found = set()
+        
+        def on_match(match_id, start, end, flags, context):
+            found.add(indicators[match_id])
+        
+        database.scan(context_lower, match_event_handler=on_match)
+        return found
+    
+    automaton = _indicator_automaton()
+    if automaton is not None:
+        # latin-1 maps each byte to one char, so ASCII indicators match as-is
+        return {indicator for _, indicator in automaton.iter(context_lower.decode('latin-1'))}
+    
+    return None
+
+
+# Static parts of the suggestion prompt; only the analysis fields and transcript vary
+_SUGGESTION_PROMPT_HEAD = """
+You are CCGuide, an expert AI assistant providing intelligent coding guidance for Claude Code sessions.
+
+SESSION ANALYSIS:
+"""
+
+_SUGGESTION_PROMPT_TAIL = """
+
+GUIDANCE REQUEST:
+As CCGuide, provide intelligent, actionable suggestions tailored to this specific session. Focus on:
+
+1. **Code Quality & Best Practices** - Specific improvements for the languages/frameworks used
+2. **Security Considerations** - Address any security concerns relevant to the work done
+3. **Performance Optimization** - Suggest performance improvements where applicable  
+4. **Testing Strategy** - Recommend testing approaches for the current work
+5. **Documentation & Maintainability** - Suggest documentation improvements
+6. **Architecture & Design** - Propose better patterns or architectural improvements
+7. **Tooling & Workflow** - Recommend tools or processes that could help
+
+FORMATTING:
+Format as markdown with clear sections. Make suggestions:
+- Specific to the actual code and context shown
+- Actionable with clear next steps
+- Prioritized by impact
+- Relevant to the session type and detected technologies
+
+Begin with: "## 🧭 CCGuide Suggestions"
+"""
 
 
 class GeminiSuggestionEngine:
@@ -15,174 +248,195 @@ class GeminiSuggestionEngine:
     def __init__(self, api_key: str, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        # Whether the last suggestions came from a Gemini response rather than the fallback
+        self.answered_by_model = False
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self._api_key = api_key
+        self._model = None
+    
+    @property
+    def model(self):
+        """Flash client, created on first use so session analysis never loads the SDK."""
+        if self._model is None:
+            self._model = get_model(self._api_key, 'gemini-2.5-flash')
+        return self._model
     
-    def analyze_session_components(self, session_context: str) -> Dict[str, Any]:
-        """Deep analysis of session components for better suggestions."""
-        analysis = {
-            'languages': self._detect_languages(session_context),
-            'frameworks': self._detect_frameworks(session_context),
-            'tools': self._detect_tools(session_context),
-            'patterns': self._detect_patterns(session_context),
-            'issues': self._detect_potential_issues(session_context),
-            'session_type': self._classify_session_type(session_context)
-        }
+    def analyze_session_components(self, session_context: str) -> Mapping[str, Any]:
+        """Deep analysis of session components for better suggestions.
         
+        Results are cached per session text and returned read-only.
+        """
+        data = session_context.encode('utf-8', 'surrogatepass')
+        key = hashlib.blake2b(data, digest_size=16).digest()
+        analysis = _ANALYSIS_CACHE.get(key)
+        if analysis is not None:
+            _ANALYSIS_CACHE.move_to_end(key)
+            return analysis
+        
+        analysis = MappingProxyType(self._analyze_session_components(data.translate(_ASCII_LOWER)))
+        _ANALYSIS_CACHE[key] = analysis
+        if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_SIZE:
+            _ANALYSIS_CACHE.popitem(last=False)
         return analysis
     
-    def _detect_languages(self, context: str) -> List[str]:
-        """Detect programming languages used in the session."""
-        language_indicators = {
-            'python': ['.py', 'def ', 'import ', 'python', 'pip', 'pytest'],
-            'javascript': ['.js', '.ts', '.jsx', '.tsx', 'function', 'const ', 'npm', 'node'],
-            'java': ['.java', 'public class', 'import java', 'maven', 'gradle'],
-            'c++': ['.cpp', '.h', '#include', 'std::', 'cmake'],
-            'rust': ['.rs', 'fn ', 'use ', 'cargo', 'impl '],
-            'go': ['.go', 'func ', 'package ', 'import '],
-            'html': ['.html', '<html>', '<div>', '<script>'],
-            'css': ['.css', 'style', 'display:', 'margin:'],
-            'sql': ['.sql', 'SELECT', 'FROM', 'WHERE', 'INSERT'],
-            'shell': ['.sh', '#!/bin/bash', 'chmod', 'mkdir']
-        }
+    def _analyze_session_components(self, context_lower: bytes) -> Dict[str, Any]:
+        """Run every detector over the lowercased session bytes."""
+        # One pass over the session finds every indicator of every category
+        found = _find_indicators(context_lower)
+        if found is not None:
+            analysis = {
+                name: self._select_categories(indicator_map, found,
+                                              min_hits=2 if name == 'patterns' else 1)
+                for name, indicator_map in _INDICATOR_CATEGORIES.items()
+            }
+            analysis['session_type'] = self._classify_session_type(context_lower, found)
+        else:
+            # Run sequentially: bytes.__contains__ holds the GIL, so a thread pool
+            # over these detectors measured no faster, only added dispatch overhead
+            analysis = {
+                'languages': self._detect_languages(context_lower),
+                'frameworks': self._detect_frameworks(context_lower),
+                'tools': self._detect_tools(context_lower),
+                'patterns': self._detect_patterns(context_lower),
+                'issues': self._detect_potential_issues(context_lower),
+                'session_type': self._classify_session_type(context_lower)
+            }
+        
+        # Display strings for the prompt and footer, formatted once and cached with the tuples
+        for name in _INDICATOR_CATEGORIES:
+            analysis[f'{name}_str'] = ', '.join(analysis[name]) or 'None detected'
         
+        return analysis
+    
+    def _select_categories(self, indicator_map: Mapping[str, Tuple[str, ...]], found: set,
+                           min_hits: int = 1) -> Tuple[str, ...]:
+        """Return the categories with at least ``min_hits`` distinct indicators in ``found``."""
+        return tuple(name for name, indicators in indicator_map.items()
+                     if sum(1 for indicator in indicators if indicator in found) >= min_hits)
+    
+    def _detect_languages(self, context_lower: bytes) -> Tuple[str, ...]:
+        """Detect programming languages used in the session."""
         detected = []
-        context_lower = context.lower()
         
-        for lang, indicators in language_indicators.items():
+        for lang, indicators in _LANGUAGE_BYTES.items():
             if any(indicator in context_lower for indicator in indicators):
                 detected.append(lang)
         
-        return detected
+        return tuple(detected)
     
-    def _detect_frameworks(self, context: str) -> List[str]:
+    def _detect_frameworks(self, context_lower: bytes) -> Tuple[str, ...]:
         """Detect frameworks and libraries used."""
-        framework_indicators = {
-            'react': ['react', 'jsx', 'usestate', 'useeffect', 'component'],
-            'vue': ['vue', '@click', 'v-model', 'mounted()'],
-            'angular': ['angular', '@component', '@injectable', 'ngmodel'],
-            'flask': ['flask', 'app.route', '@app.route', 'render_template'],
-            'django': ['django', 'models.py', 'views.py', 'urls.py'],
-            'express': ['express', 'app.get', 'app.post', 'middleware'],
-            'spring': ['spring', '@controller', '@service', '@autowired'],
-            'tensorflow': ['tensorflow', 'keras', 'model.fit', 'neural'],
-            'pytorch': ['pytorch', 'torch', 'nn.module', 'tensor'],
-            'pandas': ['pandas', 'dataframe', 'pd.read', 'groupby'],
-            'numpy': ['numpy', 'np.array', 'ndarray', 'matrix'],
-        }
-        
         detected = []
-        context_lower = context.lower()
         
-        for framework, indicators in framework_indicators.items():
+        for framework, indicators in _FRAMEWORK_BYTES.items():
             if any(indicator in context_lower for indicator in indicators):
                 detected.append(framework)
         
-        return detected
+        return tuple(detected)
     
-    def _detect_tools(self, context: str) -> List[str]:
+    def _detect_tools(self, context_lower: bytes) -> Tuple[str, ...]:
         """Detect development tools used."""
-        tool_indicators = {
-            'git': ['git add', 'git commit', 'git push', 'git pull'],
-            'docker': ['docker', 'dockerfile', 'docker-compose'],
-            'kubernetes': ['kubectl', 'k8s', 'deployment.yaml'],
-            'aws': ['aws', 'ec2', 's3', 'lambda', 'cloudformation'],
-            'ci/cd': ['github actions', 'jenkins', 'ci.yml', '.github/workflows'],
-            'testing': ['test', 'pytest', 'jest', 'unittest', 'mocha'],
-            'linting': ['eslint', 'pylint', 'flake8', 'prettier'],
-        }
-        
         detected = []
-        context_lower = context.lower()
         
-        for tool, indicators in tool_indicators.items():
+        for tool, indicators in _TOOL_BYTES.items():
             if any(indicator in context_lower for indicator in indicators):
                 detected.append(tool)
         
-        return detected
+        return tuple(detected)
     
-    def _detect_patterns(self, context: str) -> List[str]:
+    def _detect_patterns(self, context_lower: bytes) -> Tuple[str, ...]:
         """Detect development patterns and practices."""
         patterns = []
-        context_lower = context.lower()
-        
-        pattern_indicators = {
-            'api_development': ['api', 'endpoint', 'rest', 'json', 'request', 'response'],
-            'database_work': ['database', 'sql', 'query', 'table', 'migration'],
-            'frontend_work': ['frontend', 'ui', 'component', 'styling', 'responsive'],
-            'backend_work': ['backend', 'server', 'authentication', 'middleware'],
-            'data_analysis': ['data', 'analysis', 'visualization', 'statistics'],
-            'machine_learning': ['ml', 'model', 'training', 'prediction', 'algorithm'],
-            'devops': ['deployment', 'infrastructure', 'monitoring', 'scaling'],
-            'security': ['authentication', 'authorization', 'encryption', 'security'],
-        }
-        
-        for pattern, indicators in pattern_indicators.items():
-            if sum(1 for indicator in indicators if indicator in context_lower) >= 2:
-                patterns.append(pattern)
-        
-        return patterns
+        
+        for pattern, indicators in _PATTERN_BYTES.items():
+            # Two matching indicators are enough, stop searching for more
+            hits = 0
+            for indicator in indicators:
+                if indicator in context_lower:
+                    hits += 1
+                    if hits >= 2:
+                        patterns.append(pattern)
+                        break
+        
+        return tuple(patterns)
     
-    def _detect_potential_issues(self, context: str) -> List[str]:
+    def _detect_potential_issues(self, context_lower: bytes) -> Tuple[str, ...]:
         """Detect potential code quality or security issues."""
         issues = []
-        context_lower = context.lower()
-        
-        issue_patterns = {
-            'hardcoded_credentials': ['password =', 'api_key =', 'secret =', 'token ='],
-            'missing_error_handling': ['except:', 'catch', 'try:'],
-            'code_duplication': ['todo', 'fixme', 'hack', 'temporary'],
-            'performance_concerns': ['loop', 'nested', 'n+1', 'timeout'],
-            'security_concerns': ['eval(', 'exec(', 'shell=true', 'sql injection'],
-            'testing_gaps': ['# no tests', 'untested', 'manual testing'],
-        }
-        
-        for issue, indicators in issue_patterns.items():
+        
+        for issue, indicators in _ISSUE_BYTES.items():
             if any(indicator in context_lower for indicator in indicators):
                 issues.append(issue)
         
-        return issues
+        return tuple(issues)
     
-    def _classify_session_type(self, context: str) -> str:
-        """Classify the type of development session."""
-        context_lower = context.lower()
-        
-        if any(word in context_lower for word in ['new project', 'initial', 'setup', 'scaffold']):
-            return 'project_setup'
-        elif any(word in context_lower for word in ['bug', 'fix', 'error', 'debug']):
-            return 'bug_fixing'
-        elif any(word in context_lower for word in ['feature', 'implement', 'add', 'create']):
-            return 'feature_development'
-        elif any(word in context_lower for word in ['refactor', 'cleanup', 'optimize', 'improve']):
-            return 'refactoring'
-        elif any(word in context_lower for word in ['test', 'testing', 'spec', 'coverage']):
-            return 'testing'
-        elif any(word in context_lower for word in ['deploy', 'release', 'production', 'ci/cd']):
-            return 'deployment'
-        else:
+    def _classify_session_type(self, context_lower: bytes, found: Optional[set] = None) -> str:
+        """Classify the type of development session.
+        
+        ``found`` is the set of keywords already located by the single-pass scan.
+        """
+        if found is None:
+            for session_type, keywords in _SESSION_TYPE_BYTES.items():
+                if any(word in context_lower for word in keywords):
+                    return session_type
+            return 'general_development'
+        
+        # Earlier categories take priority, regardless of where their keyword appears
+        ranks = [_SESSION_TYPE_RANK[_SESSION_TYPE_KW[word]] for word in found if word in _SESSION_TYPE_KW]
+        if not ranks:
             return 'general_development'
+        
+        return _SESSION_TYPES[min(ranks)]
     
-    def generate_contextual_suggestions(self, session_context: str) -> str:
-        """Generate context-aware suggestions using Gemini Flash."""
-        analysis = self.analyze_session_components(session_context)
+    def generate_contextual_suggestions(self, session_context: str,
+                                        analysis: Optional[Mapping[str, Any]] = None) -> str:
+        """Generate context-aware suggestions using Gemini Flash.
+        
+        ``analysis`` may be passed in when the caller has already analyzed the session.
+        """
+        self.answered_by_model = False
+        if analysis is None:
+            analysis = self.analyze_session_components(session_context)
         
-        # Use full context for AI processing
-        context_for_ai = session_context
+        # Send only the head and the most recent part of long sessions
+        context_for_ai = self._prepare_context_for_ai(session_context)
         
         suggestion_prompt = self._build_suggestion_prompt(context_for_ai, analysis)
         
         try:
             response = self.model.generate_content(suggestion_prompt)
-            suggestions = response.text.strip()
+            return self._finish_suggestions(response.text, analysis)
             
-            self.logger.info(f"Generated {len(suggestions)} chars of suggestions for {analysis['session_type']} session")
-            return self._format_suggestions(suggestions, analysis)
+        except Exception as e:
+            self.logger.error(f"Suggestion generation failed: {e}")
+            return self._generate_fallback_suggestions(analysis)
+    
+    async def generate_contextual_suggestions_async(self, session_context: str,
+                                                    analysis: Optional[Mapping[str, Any]] = None) -> str:
+        """Async variant of generate_contextual_suggestions."""
+        self.answered_by_model = False
+        if analysis is None:
+            analysis = self.analyze_session_components(session_context)
+        
+        context_for_ai = self._prepare_context_for_ai(session_context)
+        suggestion_prompt = self._build_suggestion_prompt(context_for_ai, analysis)
+        
+        try:
+            response = await self.model.generate_content_async(suggestion_prompt)
+            return self._finish_suggestions(response.text, analysis)
             
         except Exception as e:
             self.logger.error(f"Suggestion generation failed: {e}")
             return self._generate_fallback_suggestions(analysis)
     
+    def _finish_suggestions(self, response_text: str, analysis: Mapping[str, Any]) -> str:
+        """Log and format the model's suggestions."""
+        suggestions = response_text.strip()
+        self.answered_by_model = True
+        
+        self.logger.info(f"Generated {len(suggestions)} chars of suggestions for {analysis['session_type']} session")
+        return self._format_suggestions(suggestions, analysis)
+    
     def _prepare_context_for_ai(self, context: str, max_chars: int = 15000) -> str:
         """Prepare context for AI processing, focusing on important parts."""
         if len(context) <= max_chars:
@@ -192,57 +446,34 @@ class GeminiSuggestionEngine:
         beginning = context[:2000]  # First 2000 chars for initial context
         recent = context[-(max_chars-2000):]  # Most recent content
         
-        return f"{beginning}\\n\\n... [middle content truncated] ...\\n\\n{recent}"
+        return f"{beginning}\n\n... [middle content truncated] ...\n\n{recent}"
     
-    def _build_suggestion_prompt(self, context: str, analysis: Dict[str, Any]) -> str:
+    def _build_suggestion_prompt(self, context: str, analysis: Mapping[str, Any]) -> str:
         """Build a comprehensive suggestion prompt based on analysis."""
-        return f"""
-You are CCGuide, an expert AI assistant providing intelligent coding guidance for Claude Code sessions.
-
-SESSION ANALYSIS:
-- Type: {analysis['session_type']}
-- Languages: {', '.join(analysis['languages']) if analysis['languages'] else 'None detected'}
-- Frameworks: {', '.join(analysis['frameworks']) if analysis['frameworks'] else 'None detected'}
-- Tools: {', '.join(analysis['tools']) if analysis['tools'] else 'None detected'}
-- Patterns: {', '.join(analysis['patterns']) if analysis['patterns'] else 'None detected'}
-- Potential Issues: {', '.join(analysis['issues']) if analysis['issues'] else 'None detected'}
-
-SESSION TRANSCRIPT:
-{context}
-
-GUIDANCE REQUEST:
-As CCGuide, provide intelligent, actionable suggestions tailored to this specific session. Focus on:
-
-1. **Code Quality & Best Practices** - Specific improvements for the languages/frameworks used
-2. **Security Considerations** - Address any security concerns relevant to the work done
-3. **Performance Optimization** - Suggest performance improvements where applicable  
-4. **Testing Strategy** - Recommend testing approaches for the current work
-5. **Documentation & Maintainability** - Suggest documentation improvements
-6. **Architecture & Design** - Propose better patterns or architectural improvements
-7. **Tooling & Workflow** - Recommend tools or processes that could help
-
-FORMATTING:
-Format as markdown with clear sections. Make suggestions:
-- Specific to the actual code and context shown
-- Actionable with clear next steps
-- Prioritized by impact
-- Relevant to the session type and detected technologies
-
-Begin with: "## 🧭 CCGuide Suggestions"
-"""
+        fields = (
+            f"- Type: {analysis['session_type']}\n"
+            f"- Languages: {analysis['languages_str']}\n"
+            f"- Frameworks: {analysis['frameworks_str']}\n"
+            f"- Tools: {analysis['tools_str']}\n"
+            f"- Patterns: {analysis['patterns_str']}\n"
+            f"- Potential Issues: {analysis['issues_str']}\n"
+            "\n"
+            "SESSION TRANSCRIPT:\n"
+        )
+        return f"{_SUGGESTION_PROMPT_HEAD}{fields}{context}{_SUGGESTION_PROMPT_TAIL}"
     
-    def _format_suggestions(self, suggestions: str, analysis: Dict[str, Any]) -> str:
+    def _format_suggestions(self, suggestions: str, analysis: Mapping[str, Any]) -> str:
         """Format and enhance the generated suggestions."""
         # Add session context footer
         session_info = f"\\n\\n---\\n*Session Analysis: {analysis['session_type']}*"
         if analysis['languages']:
-            session_info += f" *| Languages: {', '.join(analysis['languages'])}*"
+            session_info += f" *| Languages: {analysis['languages_str']}*"
         if analysis['frameworks']:
-            session_info += f" *| Frameworks: {', '.join(analysis['frameworks'])}*"
+            session_info += f" *| Frameworks: {analysis['frameworks_str']}*"
         
         return suggestions + session_info
     
-    def _generate_fallback_suggestions(self, analysis: Dict[str, Any]) -> str:
+    def _generate_fallback_suggestions(self, analysis: Mapping[str, Any]) -> str:
         """Generate basic suggestions when AI fails."""
         fallback = "## 🧭 CCGuide Suggestions\\n\\n"
         
@@ -9,26 +9,123 @@ guidance and suggestions using Google Gemini API.
 import os
 import sys
 import json
+import time
+import queue
+import atexit
+import heapq
+import asyncio
+import hashlib
 import logging
+import logging.handlers
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional, Tuple
 from datetime import datetime
-
-import google.generativeai as genai
+from functools import cached_property
 
 # Import from same directory
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from gemini_decision_engine import GeminiDecisionEngine
-from gemini_suggestion_engine import GeminiSuggestionEngine
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib json module
+    orjson = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+# Both accept bytes, so callers can skip decoding file contents
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _write_result(result: Dict[str, Any]):
+    """Write a hook result to stdout as one line of JSON."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_dumps(result) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+# Upper bound on cached hook results kept in ~/.ccguide/cache
+MAX_CACHE_ENTRIES = 200
+
+# Analysis categories; a session with none of them detected is never worth a suggestion
+ANALYSIS_SIGNALS = ('languages', 'frameworks', 'tools', 'patterns', 'issues')
+
+# Static parts of the prompts used by should_provide_suggestion/generate_suggestion;
+# only the transcript varies between calls
+_DECISION_PROMPT_HEAD = """
+You are an AI assistant analyzing a Claude Code session to determine if helpful suggestions should be provided.
+
+Analyze the following Claude Code session transcript and determine if suggestions would be valuable:
+
+SESSION TRANSCRIPT:
+"""
+
+_DECISION_PROMPT_TAIL = """
+
+Consider providing suggestions if:
+1. There are potential improvements or optimizations
+2. Best practices could be applied
+3. Security considerations should be addressed
+4. Alternative approaches might be better
+5. Code quality could be enhanced
+6. Testing or documentation gaps exist
+
+Do NOT suggest if:
+1. The task is trivial or already optimal
+2. The session is too short or incomplete
+3. User explicitly declined suggestions
+4. Recent suggestions were already provided
+
+Respond with only "YES" or "NO" and nothing else.
+"""
+
+_SUGGESTION_PROMPT_HEAD = """
+You are an expert AI coding assistant providing helpful suggestions for Claude Code sessions.
+
+Analyze the complete session transcript and provide actionable, specific suggestions for improvement.
+
+SESSION TRANSCRIPT:
+"""
+
+_SUGGESTION_PROMPT_TAIL = """
+
+Provide suggestions in the following areas if relevant:
+1. **Code Quality**: Improvements, optimizations, best practices
+2. **Security**: Potential vulnerabilities or security enhancements
+3. **Testing**: Missing tests, better test coverage, test strategies
+4. **Documentation**: Missing docs, better comments, README improvements
+5. **Architecture**: Better design patterns, refactoring opportunities
+6. **Performance**: Optimization opportunities, efficiency improvements
+7. **Maintenance**: Code organization, dependency management
+
+Format your response as:
+## 🤖 AI Suggestions
+
+[Your specific, actionable suggestions here]
+
+Keep suggestions:
+- Specific and actionable
+- Focused on the most impactful improvements
+- Relevant to the current codebase and context
+- Concise but comprehensive
+"""
+
+# Background writer for log records, started by the first CCGuide in the process
+_log_listener = None
 
 
 class CCGuide:
     """Main handler for CCGuide - Claude Code AI guidance system."""
     
     def __init__(self, config_path: Optional[str] = None):
+        self.cache_dir = Path.home() / '.ccguide' / 'cache'
         self.setup_logging()
         self.config = self.load_config(config_path)
         self.setup_gemini()
@@ -38,14 +135,32 @@ class CCGuide:
         log_dir = Path.home() / '.ccguide'
         log_dir.mkdir(exist_ok=True)
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
+        # Like basicConfig, leave an already configured root logger alone; this also
+        # keeps later instances in the process from starting another listener
+        global _log_listener
+        if _log_listener is None and not logging.getLogger().handlers:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handlers = [
                 logging.FileHandler(log_dir / 'assistant.log'),
                 logging.StreamHandler()
             ]
-        )
+            for handler in handlers:
+                handler.setFormatter(formatter)
+            
+            # Records are only enqueued on the calling thread; a background listener
+            # does the file and stderr writes
+            log_queue = queue.Queue(-1)
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            _log_listener.start()
+            atexit.register(_log_listener.stop)
+            
+            # Not basicConfig: it would give the queue handler the full format too, and the
+            # listener's handlers would then format every record a second time
+            root = logging.getLogger()
+            root.setLevel(logging.INFO)
+            root.addHandler(queue_handler)
+        
         self.logger = logging.getLogger(__name__)
     
     def load_config(self, config_path: Optional[str] = None) -> Dict[str, Any]:
@@ -62,46 +177,88 @@ class CCGuide:
             'enable_suggestions': True,
             'min_session_length': 100,  # Minimum chars before suggesting
             'suggestion_cooldown': 300,  # 5 minutes between suggestions
+            'speculative_suggest': True,  # Request suggestions while the decision is pending
         }
         
-        if config_file.exists():
-            try:
-                with open(config_file, 'r') as f:
-                    user_config = json.load(f)
-                default_config.update(user_config)
-                self.logger.info(f"Loaded config from {config_file}")
-            except Exception as e:
-                self.logger.warning(f"Failed to load config: {e}, using defaults")
+        try:
+            user_config = _loads(config_file.read_bytes())
+            default_config.update(user_config)
+            self.logger.info(f"Loaded config from {config_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Failed to load config: {e}, using defaults")
         
         return default_config
     
     def setup_gemini(self):
-        """Initialize Gemini API client."""
-        api_key = self.config.get('gemini_api_key')
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in config or environment")
+        """Check the Gemini API key.
         
-        # Initialize specialized engines
-        self.decision_engine = GeminiDecisionEngine(api_key, self.config)
-        self.suggestion_engine = GeminiSuggestionEngine(api_key, self.config)
+        The engines and the Gemini SDK are imported on first use, so hooks that
+        exit early (e.g. on a short transcript) never pay their import time.
+        """
+        self.api_key = self.config.get('gemini_api_key')
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY not found in config or environment")
+    
+    @cached_property
+    def decision_engine(self):
+        """Flash-Lite engine deciding whether to suggest."""
+        from gemini_decision_engine import GeminiDecisionEngine
+        return GeminiDecisionEngine(self.api_key, self.config)
+    
+    @cached_property
+    def suggestion_engine(self):
+        """Flash engine analyzing sessions and generating suggestions."""
+        from gemini_suggestion_engine import GeminiSuggestionEngine
+        return GeminiSuggestionEngine(self.api_key, self.config)
+    
+    # Keep legacy models for fallback
+    @cached_property
+    def decision_model(self):
+        from gemini_models import get_model
+        return get_model(self.api_key, self.config['decision_model'])
+    
+    @cached_property
+    def suggestion_model(self):
+        from gemini_models import get_model
+        return get_model(self.api_key, self.config['suggestion_model'])
+    
+    def read_transcript(self, transcript_path: str, head: int = 2000, tail: int = 13000) -> Tuple[str, int]:
+        """Read Claude Code session transcript.
         
-        # Keep legacy models for fallback
-        genai.configure(api_key=api_key)
-        self.decision_model = genai.GenerativeModel(self.config['decision_model'])
-        self.suggestion_model = genai.GenerativeModel(self.config['suggestion_model'])
+        Long transcripts are read as their first ``head`` and last ``tail`` bytes,
+        which is all that gets analyzed or sent to Gemini.
         
-        self.logger.info("Gemini API initialized successfully")
-    
-    def read_transcript(self, transcript_path: str) -> str:
-        """Read Claude Code session transcript."""
+        Returns ``(content, length)``: the session's length is its character count,
+        or the file size in bytes when only the head and tail were read.
+        """
         try:
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            self.logger.info(f"Read transcript: {len(content)} characters")
-            return content
+            with open(transcript_path, 'rb') as f:
+                # A file with fewer bytes than min_session_length can't have enough
+                # characters either, so skip reading and decoding it
+                size = os.fstat(f.fileno()).st_size
+                if size == 0 or size < self.config.get('min_session_length', 100):
+                    self.logger.info(f"Transcript too short for suggestions: {size} bytes")
+                    return "", size
+                
+                if size <= head + tail:
+                    content = f.read().decode('utf-8', 'replace')
+                    length = len(content)
+                else:
+                    length = size
+                    beginning = f.read(head)
+                    f.seek(-tail, os.SEEK_END)
+                    recent = f.read(tail)
+                    content = (beginning.decode('utf-8', 'replace')
+                               + "\n\n... [middle content truncated] ...\n\n"
+                               + recent.decode('utf-8', 'replace'))
+            
+            self.logger.info(f"Read transcript: {len(content)} characters of {size} bytes")
+            return content, length
         except Exception as e:
             self.logger.error(f"Failed to read transcript: {e}")
-            return ""
+            return "", 0
     
     def should_provide_suggestion(self, session_context: str) -> bool:
         """Use Gemini Flash-Lite to decide if a suggestion should be provided."""
@@ -111,30 +268,7 @@ class CCGuide:
         if len(session_context) < self.config['min_session_length']:
             return False
         
-        decision_prompt = f"""
-You are an AI assistant analyzing a Claude Code session to determine if helpful suggestions should be provided.
-
-Analyze the following Claude Code session transcript and determine if suggestions would be valuable:
-
-SESSION TRANSCRIPT:
-{session_context}
-
-Consider providing suggestions if:
-1. There are potential improvements or optimizations
-2. Best practices could be applied
-3. Security considerations should be addressed
-4. Alternative approaches might be better
-5. Code quality could be enhanced
-6. Testing or documentation gaps exist
-
-Do NOT suggest if:
-1. The task is trivial or already optimal
-2. The session is too short or incomplete
-3. User explicitly declined suggestions
-4. Recent suggestions were already provided
-
-Respond with only "YES" or "NO" and nothing else.
-"""
+        decision_prompt = f"{_DECISION_PROMPT_HEAD}{session_context}{_DECISION_PROMPT_TAIL}"
         
         try:
             response = self.decision_model.generate_content(decision_prompt)
@@ -150,34 +284,7 @@ Respond with only "YES" or "NO" and nothing else.
     
     def generate_suggestion(self, session_context: str) -> str:
         """Use Gemini Flash to generate detailed suggestions."""
-        suggestion_prompt = f"""
-You are an expert AI coding assistant providing helpful suggestions for Claude Code sessions.
-
-Analyze the complete session transcript and provide actionable, specific suggestions for improvement.
-
-SESSION TRANSCRIPT:
-{session_context}
-
-Provide suggestions in the following areas if relevant:
-1. **Code Quality**: Improvements, optimizations, best practices
-2. **Security**: Potential vulnerabilities or security enhancements
-3. **Testing**: Missing tests, better test coverage, test strategies
-4. **Documentation**: Missing docs, better comments, README improvements
-5. **Architecture**: Better design patterns, refactoring opportunities
-6. **Performance**: Optimization opportunities, efficiency improvements
-7. **Maintenance**: Code organization, dependency management
-
-Format your response as:
-## 🤖 AI Suggestions
-
-[Your specific, actionable suggestions here]
-
-Keep suggestions:
-- Specific and actionable
-- Focused on the most impactful improvements
-- Relevant to the current codebase and context
-- Concise but comprehensive
-"""
+        suggestion_prompt = f"{_SUGGESTION_PROMPT_HEAD}{session_context}{_SUGGESTION_PROMPT_TAIL}"
         
         try:
             response = self.suggestion_model.generate_content(suggestion_prompt)
@@ -189,32 +296,144 @@ Keep suggestions:
             self.logger.error(f"Suggestion model failed: {e}")
             return "❌ Failed to generate suggestions. Please check the logs."
     
+    def _cache_path(self, session_context: str) -> Path:
+        """Cache file for a transcript, named by a digest of its contents."""
+        digest = hashlib.blake2b(session_context.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+    
+    def _load_cached_result(self, cache_file: Path) -> Optional[Dict[str, Any]]:
+        """Return a cached result younger than the suggestion cooldown, if any."""
+        try:
+            if time.time() - cache_file.stat().st_mtime >= self.config.get('suggestion_cooldown', 300):
+                return None
+            return _loads(cache_file.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Failed to read cached result: {e}")
+            return None
+    
+    def _store_cached_result(self, cache_file: Path, result: Dict[str, Any]):
+        """Atomically write a result to the cache and evict the oldest entries."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix('.json.tmp')
+            tmp_file.write_bytes(_dumps(result))
+            os.replace(tmp_file, cache_file)
+            
+            # Another hook process may evict the same entries concurrently, so
+            # anything that has already disappeared is skipped, not fatal
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue
+            if len(entries) > MAX_CACHE_ENTRIES:
+                excess = len(entries) - MAX_CACHE_ENTRIES
+                for _, path in heapq.nsmallest(excess, entries):
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        continue
+        except Exception as e:
+            self.logger.warning(f"Failed to cache result: {e}")
+    
+    async def _speculative_suggestion(self, session_id: str, session_context: str,
+                                      analysis: Mapping[str, Any], length: int) -> Optional[str]:
+        """Generate suggestions while the decision is pending; None if the decision is NO."""
+        decision_task = asyncio.create_task(
+            self.decision_engine.should_suggest_async(session_id, session_context, length))
+        
+        # Let the decision run its local checks (enabled, length, cooldown) first so
+        # no suggestion request is started for sessions rejected without the network
+        await asyncio.sleep(0)
+        if decision_task.done() and not decision_task.result():
+            return None
+        
+        suggestion_task = asyncio.create_task(
+            self.suggestion_engine.generate_contextual_suggestions_async(session_context, analysis))
+        
+        if not await decision_task:
+            suggestion_task.cancel()
+            await asyncio.gather(suggestion_task, return_exceptions=True)
+            return None
+        
+        return await suggestion_task
+    
     def process_stop_hook(self, session_id: str, transcript_path: str) -> Dict[str, Any]:
         """Main handler for Claude Code stop hook."""
         self.logger.info(f"Processing stop hook for session {session_id}")
         
+        # Checked before the cache so disabling takes effect immediately
+        if not self.config.get('enable_suggestions', True):
+            self.logger.info("Suggestions disabled in config")
+            return {"block": False}
+        
         # Read session transcript
-        session_context = self.read_transcript(transcript_path)
+        session_context, length = self.read_transcript(transcript_path)
         if not session_context:
             return {"block": False}
         
-        # Check if we should provide suggestions using advanced decision engine
-        if not self.decision_engine.should_suggest(session_id, session_context):
-            self.logger.info("No suggestions needed")
-            return {"block": False}
+        # An unchanged transcript gets the result computed for it last time
+        cache_file = self._cache_path(session_context)
+        cached = self._load_cached_result(cache_file)
+        if cached is not None:
+            self.logger.info("Returning cached result for unchanged transcript")
+            return cached
         
-        # Generate suggestions using advanced suggestion engine
-        suggestion = self.suggestion_engine.generate_contextual_suggestions(session_context)
+        result, from_model = self._run_pipeline(session_id, session_context, length)
+        # Local skips are cheap to recompute, and fallback output must not outlive an outage
+        if from_model:
+            self._store_cached_result(cache_file, result)
+        return result
+    
+    def _run_pipeline(self, session_id: str, session_context: str,
+                      length: Optional[int] = None) -> Tuple[Dict[str, Any], bool]:
+        """Decide whether to suggest and generate the suggestions.
+        
+        ``length`` is the full session's length when ``session_context`` is a window of it.
+        
+        Returns the hook result and whether it came entirely from model responses,
+        i.e. neither a local check nor a fallback decided it.
+        """
+        # The decision would be NO anyway; don't spend the scan on it
+        if self.decision_engine.is_in_cooldown(session_id):
+            return {"block": False}, False
         
+        # Sessions with nothing detected locally don't need the decision model
+        analysis = self.suggestion_engine.analyze_session_components(session_context)
+        if not any(analysis[key] for key in ANALYSIS_SIGNALS):
+            self.logger.info("Nothing detected in session, skipping decision")
+            return {"block": False}, False
+        
+        if self.config.get('speculative_suggest', True):
+            # Overlap the decision and suggestion round trips
+            suggestion = asyncio.run(
+                self._speculative_suggestion(session_id, session_context, analysis, length))
+        else:
+            # Check if we should provide suggestions using advanced decision engine
+            if self.decision_engine.should_suggest(session_id, session_context, length):
+                # Generate suggestions using advanced suggestion engine
+                suggestion = self.suggestion_engine.generate_contextual_suggestions(session_context, analysis)
+            else:
+                suggestion = None
+        
+        from_model = self.decision_engine.answered_by_model
+        if suggestion is None:
+            self.logger.info("No suggestions needed")
+            return {"block": False}, from_model
+        
+        from_model = from_model and self.suggestion_engine.answered_by_model
         if suggestion:
             # Return suggestions to Claude Code
             return {
                 "block": False,
                 "context": suggestion,
                 "reason": "CCGuide suggestions available"
-            }
+            }, from_model
         else:
-            return {"block": False}
+            return {"block": False}, from_model
 
 
 def main():
@@ -225,7 +444,7 @@ def main():
         transcript_path = os.getenv('TRANSCRIPT_PATH', sys.argv[2] if len(sys.argv) > 2 else '')
         
         if not transcript_path:
-            print(json.dumps({"block": False, "error": "No transcript path provided"}))
+            _write_result({"block": False, "error": "No transcript path provided"})
             return
         
         # Initialize and run the assistant
@@ -233,14 +452,14 @@ def main():
         result = assistant.process_stop_hook(session_id, transcript_path)
         
         # Output result as JSON for Claude Code
-        print(json.dumps(result))
+        _write_result(result)
         
     except Exception as e:
         error_result = {
             "block": False,
             "error": f"Hook handler failed: {str(e)}"
         }
-        print(json.dumps(error_result))
+        _write_result(error_result)
         logging.error(f"Hook handler failed: {e}")
 
 
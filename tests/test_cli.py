@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+CCGuide CLI Test
+
+Checks the CLI's argparse-free fast path against the full parser.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'cli'))
+
+from ccguide_cli import _build_parser, _fast_parse_args
+
+
+PARITY_CASES = [
+    ['status'], ['status', '-v'], ['status', '--verbose'],
+    ['enable'], ['disable'], ['toggle'], ['hooks'],
+    ['config'], ['config', '--api-key', 'abc'], ['config', '--api-key=abc'],
+    ['config', '--api-key='], ['config', '--api-key', 'a=b'],
+    ['config', '--cooldown', '20'], ['config', '--cooldown=20'], ['config', '--cooldown', '-5'],
+    ['config', '--min-length', '50', '--cooldown', '10', '--api-key', 'k'],
+    ['config', '--cooldown', '1', '--cooldown', '2'], ['config', '--api-key', '-1.5'],
+    ['config', '--api-key', '-.5'],
+    ['logs'], ['logs', '-n', '5'], ['logs', '-n=5'], ['logs', '--lines', '7'], ['logs', '--lines=7'],
+    ['test'], ['test', '--deep'],
+]
+
+# Each of these must be left to argparse (help, errors or forms the fast path doesn't model)
+FALLBACK_CASES = [
+    [], ['-h'], ['--help'], ['status', '-h'], ['config', '--help'], ['bogus'],
+    ['status', '--verbose=1'], ['test', '--deep=yes'],
+    ['config', '--cooldown'], ['config', '--api-key'], ['logs', '-n'],
+    ['config', '--cooldown', 'soon'], ['config', '--cooldown=1.5'], ['logs', '-n', 'x'],
+    ['config', '--cooldown', '--min-length', '5'], ['config', '--api-key', '-abc'],
+    ['config', '--api-key', '-'], ['config', '--api-key', '-1.'], ['config', '--api-key', '-1e3'],
+    ['config', '--cool', '5'], ['logs', '--unknown'], ['status', 'extra'], ['config', '--', 'x'],
+]
+
+
+@pytest.mark.parametrize('argv', PARITY_CASES, ids=' '.join)
+def test_fast_path_matches_argparse(argv):
+    """Command lines the fast path accepts parse exactly as argparse would."""
+    fast = _fast_parse_args(argv)
+    assert fast is not None
+    assert vars(fast) == vars(_build_parser().parse_args(argv))
+
+
+@pytest.mark.parametrize('argv', FALLBACK_CASES, ids=lambda argv: ' '.join(argv) or '<empty>')
+def test_fast_path_defers_to_argparse(argv):
+    """Help, unknown flags, missing or malformed values all fall back to argparse."""
+    assert _fast_parse_args(argv) is None
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+CCGuide CLI Logs Test
+
+Checks the backwards log tail behind `ccguide logs` against reading the whole file.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'cli'))
+
+from ccguide_cli import CCGuideCLI
+
+
+def write_log(path: Path, size: int, seed: int, newline: bytes) -> bytes:
+    """Write a log of roughly ``size`` bytes with lines of varying length."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size:
+        line = b'x' * rng.choice([0, 1, 5, 40, 200, 5000]) + str(len(lines)).encode()
+        lines.append(line)
+        total += len(line) + len(newline)
+    data = newline.join(lines) + (newline if seed % 2 else b'')
+    path.write_bytes(data)
+    return data
+
+
+@pytest.mark.parametrize('size', [0, 100, 64 * 1024 - 1, 64 * 1024 + 1, 300 * 1024])
+@pytest.mark.parametrize('newline', [b'\n', b'\r\n'], ids=['lf', 'crlf'])
+def test_tail_lines_matches_full_read(tmp_path, size, newline):
+    """Seeking back from EOF returns the same lines as splitting the whole file."""
+    cli = CCGuideCLI()
+    log = tmp_path / 'assistant.log'
+
+    for seed in range(4):
+        data = write_log(log, size, seed, newline)
+        expected_lines = data.splitlines()
+        # Tiny chunks put chunk boundaries inside lines and between \r and \n
+        cases = [(chunk_size, lines) for chunk_size in (1, 7) for lines in (1, 2)]
+        cases += [(chunk_size, lines) for chunk_size in (4096, 8192)
+                  for lines in (0, 1, 2, 20, 500, len(expected_lines) + 5)]
+        for chunk_size, lines in cases:
+            assert cli._tail_lines(log, lines, chunk_size) == expected_lines[-lines:], \
+                (size, seed, chunk_size, lines)
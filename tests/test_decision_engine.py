@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Decision Engine Test
+
+Checks how the decision engine reads the model's YES/NO answer.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from gemini_decision_engine import GeminiDecisionEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = GeminiDecisionEngine('test-key', {})
+    engine.cooldown_file = tmp_path / 'last_suggestion.txt'
+    return engine
+
+
+@pytest.mark.parametrize('response_text', [
+    'YES', 'yes', 'Yes.', '  YES\n', 'YES - the session has untested code', 'Yes, because',
+])
+def test_leading_yes_token(engine, response_text):
+    """A leading YES word counts, whatever its case or trailing punctuation."""
+    assert engine._record_decision('s', response_text) is True
+    assert engine.cooldown_file.exists()
+
+
+@pytest.mark.parametrize('response_text', [
+    'NO', 'no.', 'Yesterday the session...', 'YESNO', 'Yes_', 'Maybe YES', '',
+])
+def test_anything_else_is_no(engine, response_text):
+    """Only a real leading YES token counts; words that merely start with 'yes' don't."""
+    assert engine._record_decision('s', response_text) is False
+    assert not engine.cooldown_file.exists()
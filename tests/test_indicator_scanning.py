@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Indicator Scanning Test
+
+Checks that every scanner backend in the suggestion engine (Hyperscan,
+pyahocorasick and the bytes fallback) produces the same analysis as the
+original str.lower() + substring detectors.
+"""
+
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import gemini_suggestion_engine as engine_module
+from gemini_suggestion_engine import GeminiSuggestionEngine
+
+
+def reference_analysis(session_context: str) -> dict:
+    """The detectors as originally written: lowercase the text, then `in` per indicator."""
+    lower = session_context.lower()
+
+    def any_match(indicator_map):
+        return [name for name, indicators in indicator_map.items()
+                if any(indicator in lower for indicator in indicators)]
+
+    session_type = 'general_development'
+    for name, keywords in engine_module._SESSION_TYPE_KEYWORDS.items():
+        if any(word in lower for word in keywords):
+            session_type = name
+            break
+
+    return {
+        'languages': any_match(engine_module._LANGUAGE_INDICATORS),
+        'frameworks': any_match(engine_module._FRAMEWORK_INDICATORS),
+        'tools': any_match(engine_module._TOOL_INDICATORS),
+        'patterns': [name for name, indicators in engine_module._PATTERN_INDICATORS.items()
+                     if sum(1 for indicator in indicators if indicator in lower) >= 2],
+        'issues': any_match(engine_module._ISSUE_PATTERNS),
+        'session_type': session_type,
+    }
+
+
+def random_sessions(count: int, seed: int = 0) -> list:
+    """Sessions built from indicator strings, their case variants and unrelated noise."""
+    vocab = list(engine_module._all_indicators())
+    vocab += [word.upper() for word in vocab[::3]] + [word.title() for word in vocab[1::3]]
+    vocab += ['hello', 'the', 'world', 'ß', 'Straße', 'naïve', '日本語', '\n', '\r\n', '\t', '  ']
+
+    rng = random.Random(seed)
+    sessions = ['', 'plain prose about nothing in particular']
+    for _ in range(count):
+        size = rng.choice([1, 2, 3, 5, 10, 30, 80])
+        sessions.append(''.join(rng.choice(vocab) + rng.choice(['', ' ', 'x', '_'])
+                                for _ in range(size)))
+    return sessions
+
+
+@pytest.fixture(params=['hyperscan', 'ahocorasick', 'fallback'])
+def backend(request, monkeypatch):
+    """Force one scanner backend by hiding the accelerators ranked above it."""
+    if request.param == 'hyperscan' and engine_module.hyperscan is None:
+        pytest.skip("hyperscan is not installed")
+    if request.param == 'ahocorasick' and engine_module.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+
+    if request.param != 'hyperscan':
+        monkeypatch.setattr(engine_module, 'hyperscan', None)
+    if request.param == 'fallback':
+        monkeypatch.setattr(engine_module, 'ahocorasick', None)
+    monkeypatch.setattr(engine_module, '_database', None)
+    monkeypatch.setattr(engine_module, '_automaton', None)
+    monkeypatch.setattr(engine_module, '_ANALYSIS_CACHE', type(engine_module._ANALYSIS_CACHE)())
+    return request.param
+
+
+def test_backend_is_the_one_forced(backend):
+    """The fixture really selects the requested backend."""
+    found = engine_module._find_indicators(b'def main(): pass')
+    if backend == 'fallback':
+        assert found is None
+    else:
+        assert found is not None
+        assert (engine_module._indicator_database() is not None) == (backend == 'hyperscan')
+
+
+def test_analysis_matches_reference(backend):
+    """Every backend agrees with the original detectors on random sessions."""
+    engine = GeminiSuggestionEngine('test-key', {})
+
+    for session in random_sessions(1500):
+        analysis = engine.analyze_session_components(session)
+        expected = reference_analysis(session)
+        assert {key: list(analysis[key]) if key != 'session_type' else analysis[key]
+                for key in expected} == expected, session
+
+
+def test_display_strings(backend):
+    """Each category gets a joined display string, 'None detected' when empty."""
+    engine = GeminiSuggestionEngine('test-key', {})
+
+    analysis = engine.analyze_session_components('import pandas as pd\ndf.groupby("x")')
+    assert analysis['languages_str'] == ', '.join(analysis['languages'])
+    assert 'pandas' in analysis['frameworks_str']
+
+    analysis = engine.analyze_session_components('plain prose about nothing in particular')
+    assert analysis['languages_str'] == 'None detected'
+
+
+def test_hyperscan_compile_failure_falls_back(monkeypatch):
+    """A Hyperscan that fails to compile leaves the next backend in charge, with the same results."""
+    class BrokenDatabase:
+        def __init__(self, mode):
+            pass
+
+        def compile(self, **kwargs):
+            raise RuntimeError("unsupported CPU")
+
+    monkeypatch.setattr(engine_module, 'hyperscan', SimpleNamespace(
+        Database=BrokenDatabase, HS_MODE_BLOCK=1, HS_FLAG_SINGLEMATCH=8))
+    monkeypatch.setattr(engine_module, '_database', None)
+    monkeypatch.setattr(engine_module, '_automaton', None)
+    monkeypatch.setattr(engine_module, '_ANALYSIS_CACHE', type(engine_module._ANALYSIS_CACHE)())
+
+    assert engine_module._indicator_database() is None
+    engine = GeminiSuggestionEngine('test-key', {})
+    for session in random_sessions(200, seed=1):
+        analysis = engine.analyze_session_components(session)
+        expected = reference_analysis(session)
+        assert {key: list(analysis[key]) if key != 'session_type' else analysis[key]
+                for key in expected} == expected, session
+
+
+def test_cached_analysis_is_immutable(backend):
+    """The cached analysis and its category values can't be changed through a returned copy."""
+    engine = GeminiSuggestionEngine('test-key', {})
+    session = 'import pandas as pd\ndf.groupby("x")'
+
+    analysis = engine.analyze_session_components(session)
+    with pytest.raises(TypeError):
+        analysis['languages'] = ('cobol',)
+    for key in ('languages', 'frameworks', 'tools', 'patterns', 'issues'):
+        assert isinstance(analysis[key], tuple)
+    assert engine.analyze_session_components(session) is analysis
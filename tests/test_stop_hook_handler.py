@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Stop Hook Handler Test
+
+Runs the hook pipeline end to end against stub Gemini models, in a temporary
+home directory, and checks which model calls are made and what comes back.
+"""
+
+import asyncio
+import heapq
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import stop_hook_handler
+from stop_hook_handler import CCGuide
+
+
+CODING_SESSION = "def load(path):\n    raise ValueError('bad path')\nTraceback: error in load\n" * 20
+# Tools are detected, but there is no code or error for the decision engine to act on
+OPS_SESSION = "please run docker compose up, then kubectl apply the manifests\n" * 20
+
+
+class StubModel:
+    """Stands in for a GenerativeModel, recording every call it receives."""
+
+    def __init__(self, reply: str = '', error: Exception = None, delay: float = 0.0):
+        self.reply = reply
+        self.error = error
+        self.delay = delay
+        self.calls = []
+        self.finished = []
+
+    def generate_content(self, prompt):
+        self.calls.append('sync')
+        if self.error:
+            raise self.error
+        self.finished.append('sync')
+        return SimpleNamespace(text=self.reply)
+
+    async def generate_content_async(self, prompt):
+        self.calls.append('async')
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.finished.append('async')
+        return SimpleNamespace(text=self.reply)
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    return tmp_path
+
+
+def make_guide(decision: StubModel, suggestion: StubModel, speculative: bool = True) -> CCGuide:
+    guide = CCGuide()
+    guide.config['speculative_suggest'] = speculative
+    guide.decision_engine._model = decision
+    guide.suggestion_engine._model = suggestion
+    return guide
+
+
+def write_transcript(home: Path, text: str) -> str:
+    path = home / 'transcript.txt'
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('speculative', [True, False], ids=['speculative', 'sequential'])
+def test_yes_returns_suggestions(home, speculative):
+    decision = StubModel('YES', delay=0.01)
+    suggestion = StubModel('Add a test for load()')
+    guide = make_guide(decision, suggestion, speculative)
+
+    result = guide.process_stop_hook('s', write_transcript(home, CODING_SESSION))
+
+    mode = 'async' if speculative else 'sync'
+    assert decision.calls == [mode] and suggestion.calls == [mode]
+    assert result['block'] is False
+    assert result['context'].startswith('Add a test for load()')
+    assert result['reason'] == "CCGuide suggestions available"
+    assert (home / '.ccguide' / 'last_suggestion.txt').exists()
+
+
+def test_speculative_no_cancels_the_suggestion_request(home):
+    decision = StubModel('NO', delay=0.01)
+    suggestion = StubModel('never shown', delay=5)
+    guide = make_guide(decision, suggestion)
+
+    result = guide.process_stop_hook('s', write_transcript(home, CODING_SESSION))
+
+    assert result == {"block": False}
+    assert decision.finished == ['async']
+    # Started speculatively, then cancelled instead of awaited
+    assert suggestion.calls == ['async'] and suggestion.finished == []
+    assert not (home / '.ccguide' / 'last_suggestion.txt').exists()
+
+
+def test_sequential_no_skips_the_suggestion_request(home):
+    decision = StubModel('NO')
+    suggestion = StubModel('never shown')
+    guide = make_guide(decision, suggestion, speculative=False)
+
+    result = guide.process_stop_hook('s', write_transcript(home, CODING_SESSION))
+
+    assert result == {"block": False}
+    assert decision.calls == ['sync'] and suggestion.calls == []
+
+
+@pytest.mark.parametrize('speculative', [True, False], ids=['speculative', 'sequential'])
+def test_local_rejection_makes_no_model_calls(home, speculative):
+    decision = StubModel('YES')
+    suggestion = StubModel('never shown')
+    guide = make_guide(decision, suggestion, speculative)
+    # Gets past the handler's own skip, so the decision engine is what rejects it
+    assert guide.suggestion_engine.analyze_session_components(OPS_SESSION)['tools']
+
+    # Record whether a suggestion request is even created, not just whether it ran
+    requested = []
+    generate = guide.suggestion_engine.generate_contextual_suggestions_async
+
+    def record(*args):
+        requested.append(args)
+        return generate(*args)
+
+    guide.suggestion_engine.generate_contextual_suggestions_async = record
+
+    result = guide.process_stop_hook('s', write_transcript(home, OPS_SESSION))
+
+    assert result == {"block": False}
+    assert decision.calls == [] and suggestion.calls == []
+    assert requested == []
+
+
+def test_cooldown_makes_no_model_calls(home):
+    decision = StubModel('YES')
+    suggestion = StubModel('never shown')
+    guide = make_guide(decision, suggestion)
+    guide.decision_engine.update_cooldown()
+
+    result = guide.process_stop_hook('s', write_transcript(home, CODING_SESSION))
+
+    assert result == {"block": False}
+    assert decision.calls == [] and suggestion.calls == []
+
+
+@pytest.mark.parametrize('speculative', [True, False], ids=['speculative', 'sequential'])
+def test_suggestion_failure_returns_fallback_guidance(home, speculative):
+    decision = StubModel('YES')
+    suggestion = StubModel(error=RuntimeError('quota exceeded'))
+    guide = make_guide(decision, suggestion, speculative)
+
+    result = guide.process_stop_hook('s', write_transcript(home, CODING_SESSION))
+
+    assert len(suggestion.calls) == 1
+    assert "temporarily unavailable" in result['context']
+    assert guide.suggestion_engine.answered_by_model is False
+
+
+def test_decision_failure_uses_the_fallback_heuristic(home):
+    decision = StubModel(error=RuntimeError('unavailable'))
+    suggestion = StubModel('Heuristic said yes')
+    guide = make_guide(decision, suggestion)
+
+    result = guide.process_stop_hook('s', write_transcript(home, CODING_SESSION * 2))
+
+    # Code and errors in a session over 1000 chars score enough to suggest
+    assert result['context'].startswith('Heuristic said yes')
+    assert guide.decision_engine.answered_by_model is False
+
+
+
+def cache_files(guide: CCGuide) -> list:
+    return sorted(guide.cache_dir.glob('*.json')) if guide.cache_dir.exists() else []
+
+
+def test_model_result_is_cached_and_replayed(home):
+    transcript = write_transcript(home, CODING_SESSION)
+    first = make_guide(StubModel('YES'), StubModel('Add a test for load()'))
+    result = first.process_stop_hook('s', transcript)
+    assert len(cache_files(first)) == 1
+
+    decision, suggestion = StubModel('YES'), StubModel('different')
+    replayed = make_guide(decision, suggestion).process_stop_hook('s', transcript)
+
+    assert replayed == result
+    assert decision.calls == [] and suggestion.calls == []
+
+
+def test_cache_expires_after_the_suggestion_cooldown(home):
+    transcript = write_transcript(home, CODING_SESSION)
+    guide = make_guide(StubModel('NO'), StubModel('never shown'))
+    assert guide.process_stop_hook('s', transcript) == {"block": False}
+    [cache_file] = cache_files(guide)
+
+    decision = StubModel('NO')
+    guide = make_guide(decision, StubModel('never shown'))
+    guide.process_stop_hook('s', transcript)
+    assert decision.calls == []
+
+    stale = cache_file.stat().st_mtime - guide.config['suggestion_cooldown']
+    os.utime(cache_file, (stale, stale))
+    guide.process_stop_hook('s', transcript)
+    assert decision.calls == ['async']
+
+
+@pytest.mark.parametrize('session, decision, suggestion', [
+    (OPS_SESSION, StubModel('YES'), StubModel('never shown')),
+    (CODING_SESSION, StubModel('YES'), StubModel(error=RuntimeError('quota exceeded'))),
+    (CODING_SESSION * 2, StubModel(error=RuntimeError('unavailable')), StubModel('Heuristic said yes')),
+], ids=['local-rejection', 'suggestion-fallback', 'decision-fallback'])
+def test_results_not_from_the_model_are_not_cached(home, session, decision, suggestion):
+    guide = make_guide(decision, suggestion)
+    guide.process_stop_hook('s', write_transcript(home, session))
+    assert cache_files(guide) == []
+
+
+def test_disabling_takes_precedence_over_the_cache(home):
+    transcript = write_transcript(home, CODING_SESSION)
+    guide = make_guide(StubModel('YES'), StubModel('Add a test for load()'))
+    guide.process_stop_hook('s', transcript)
+    assert cache_files(guide)
+
+    guide = make_guide(StubModel('YES'), StubModel('never shown'))
+    guide.config['enable_suggestions'] = False
+    assert guide.process_stop_hook('s', transcript) == {"block": False}
+
+
+def fill_cache(guide: CCGuide, count: int) -> list:
+    """Cache entries with increasing modification times, oldest first."""
+    guide.cache_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = guide.cache_dir / f'{i:032x}.json'
+        path.write_text('{"block": false}')
+        os.utime(path, (1000 + i, 1000 + i))
+        paths.append(path)
+    return paths
+
+
+def test_eviction_keeps_the_newest_entries(home, monkeypatch):
+    monkeypatch.setattr(stop_hook_handler, 'MAX_CACHE_ENTRIES', 3)
+    guide = make_guide(StubModel('NO'), StubModel('never shown'))
+    old = fill_cache(guide, 5)
+
+    guide.process_stop_hook('s', write_transcript(home, CODING_SESSION))
+
+    remaining = cache_files(guide)
+    assert len(remaining) == 3
+    assert set(old[3:]) < set(remaining)
+
+
+def test_eviction_skips_entries_removed_concurrently(home, monkeypatch):
+    monkeypatch.setattr(stop_hook_handler, 'MAX_CACHE_ENTRIES', 3)
+    guide = make_guide(StubModel('NO'), StubModel('never shown'))
+    old = fill_cache(guide, 6)
+
+    # One entry vanishes between listing and stat, another between selection and unlink
+    scandir, nsmallest = os.scandir, heapq.nsmallest
+
+    def racing_scandir(path):
+        entries = list(scandir(path))
+        old[5].unlink()
+        return iter(entries)
+
+    def racing_nsmallest(n, iterable, *args, **kwargs):
+        chosen = nsmallest(n, iterable, *args, **kwargs)
+        old[0].unlink()
+        return chosen
+
+    monkeypatch.setattr(stop_hook_handler.os, 'scandir', racing_scandir)
+    monkeypatch.setattr(stop_hook_handler.heapq, 'nsmallest', racing_nsmallest)
+
+    guide.process_stop_hook('s', write_transcript(home, CODING_SESSION))
+    monkeypatch.undo()
+
+    remaining = cache_files(guide)
+    assert len(remaining) == 3
+    assert set(old[3:5]) < set(remaining)